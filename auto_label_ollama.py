@@ -1,15 +1,38 @@
 import json
-import subprocess
+import argparse
+import urllib.error
+import urllib.parse
+import urllib.request
 import re
 import os
 import time
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 
+from jsonl_reader import read_jsonl
+from settings import SETTINGS
+
 INPUT_FILE = "training_data.jsonl"
 OUTPUT_FILE = "training_data_labeled.jsonl"
+STATS_FILE = "labeling_stats.json"   # read by generate_training_data.py for its time-saved estimate
+
+MODEL = SETTINGS["ollama_model"]   # 🔥 phi3:instruct is best for Mac M4 (Metal GPU)
+
+OLLAMA_URL = SETTINGS["ollama_url"]
+REQUEST_TIMEOUT = 300     # seconds; a stalled request must not hang a worker forever
+KEEP_ALIVE = "30m"        # keep model + prompt KV cache resident between resumes
+
+# Fixed instructions go FIRST and must stay byte-identical across requests:
+# Ollama reuses the KV state of a matching prompt prefix, so only the
+# resume body is prefilled for each request.
+LABEL_PROMPT_PREFIX = """
+Analyze the resume below.
+Return ONLY valid JSON with keys:
+grammar, skills, experience, projects, overall_summary.
+Keep each field under 120 words.
 
-MODEL = "phi3:instruct"   # 🔥 Best for Mac M4 (Metal GPU)
+Resume:
+"""
 
 # ---------------------------------------------------------
 # Resume compression (token reduction)
@@ -36,34 +59,52 @@ def extract_json(text):
 # Run Ollama (Metal GPU auto-enabled)
 # ---------------------------------------------------------
 def run_ollama(prompt):
-    result = subprocess.run(
-        ["ollama", "run", MODEL],
-        input=prompt,
-        text=True,
-        encoding="utf-8",
-        errors="ignore",
-        capture_output=True
+    payload = json.dumps({
+        "model": MODEL,
+        "prompt": prompt,
+        "stream": False,
+        "keep_alive": KEEP_ALIVE
+    }).encode("utf-8")
+
+    request = urllib.request.Request(
+        OLLAMA_URL,
+        data=payload,
+        headers={"Content-Type": "application/json"}
     )
-    return result.stdout.strip()
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        result = json.loads(response.read().decode("utf-8", errors="ignore"))
+
+    return result.get("response", "").strip()
+
+
+def check_model():
+    """Return an error message if Ollama is unreachable or MODEL is not pulled, else None.
+
+    /api/generate does not pull missing models the way `ollama run` did.
+    """
+    request = urllib.request.Request(
+        urllib.parse.urljoin(OLLAMA_URL, "/api/show"),
+        data=json.dumps({"model": MODEL, "name": MODEL}).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30):
+            return None
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return f"Model '{MODEL}' is not available locally. Run `ollama pull {MODEL}` first."
+        return f"Ollama /api/show failed: HTTP {e.code}"
+    except urllib.error.URLError as e:
+        return f"Cannot reach Ollama at {OLLAMA_URL} ({e.reason}). Is `ollama serve` running?"
 
 
 # ---------------------------------------------------------
 # Worker (single resume)
 # ---------------------------------------------------------
-def process_one_entry(line):
-    entry = json.loads(line)
-
+def process_one_entry(entry):
     resume_text = compress_resume(entry["input"])
 
-    prompt = f"""
-Analyze the resume below.
-Return ONLY valid JSON with keys:
-grammar, skills, experience, projects, overall_summary.
-Keep each field under 120 words.
-
-Resume:
-{resume_text}
-"""
+    prompt = f"{LABEL_PROMPT_PREFIX}{resume_text}\n"
 
     response = run_ollama(prompt)
     entry["output"] = extract_json(response)
@@ -72,14 +113,25 @@ Resume:
 # MAIN
 # ---------------------------------------------------------
 def main():
-    if not os.path.exists(INPUT_FILE):
-        print("❌ training_data.jsonl not found.")
+    parser = argparse.ArgumentParser(description="Auto-label training prompts with a local Ollama model.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ {args.input} not found.")
         return
 
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    error = check_model()
+    if error:
+        print(f"❌ {error}")
+        return
+
+    entries, errors = read_jsonl(args.input, schema="input")
+    for line_number, error in errors[:10]:
+        print(f"⚠️ Skipping line {line_number}: {error}")
 
-    total = len(lines)
+    total = len(entries)
     print(f"\n📦 Total resumes: {total}")
 
     # ✅ Mac M4 safe worker count
@@ -94,7 +146,7 @@ def main():
     start_time = time.time()
 
     with ProcessPoolExecutor(max_workers=workers) as executor:
-        futures = [executor.submit(process_one_entry, line) for line in lines]
+        futures = [executor.submit(process_one_entry, entry) for entry in entries]
 
         for future in as_completed(futures):
             try:
@@ -115,16 +167,25 @@ def main():
             except Exception as e:
                 print(f"❌ Failed entry: {e}")
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+    with open(args.output, "w", encoding="utf-8") as f:
         for entry in results:
             f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
     total_time = time.time() - start_time
     print("\n✅ Auto-labeling completed!")
-    print(f"📁 Saved: {OUTPUT_FILE}")
+    print(f"📁 Saved: {args.output}")
     print(f"📝 Total labeled samples: {len(results)}")
     print(f"⏱ Total time: {total_time/60:.1f} minutes")
     print(f"🚀 Avg speed: {len(results)/total_time:.2f} resumes/sec")
 
+    if results:
+        with open(STATS_FILE, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": MODEL,
+                "workers": workers,
+                "resumes": len(results),
+                "seconds_per_resume": total_time / len(results)
+            }, f, indent=2)
+
 if __name__ == "__main__":
     main()
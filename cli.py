@@ -0,0 +1,92 @@
+import sys
+import time
+import argparse
+import importlib
+import subprocess
+
+# ---------------------------------------------------------
+# Subcommands → module whose main() runs it.
+# Modules are imported only when their command runs, so e.g.
+# `cli.py validate` never pays for torch / transformers / OCR imports.
+# ---------------------------------------------------------
+COMMANDS = {
+    "extract":         ("resume_extractor",       "Extract text from PDF / image / DOCX resumes"),
+    "quality":         ("quality_filter",         "Report OCR-noise quality scores for the manifest"),
+    "generate":        ("generate_training_data", "Build training prompts from the manifest"),
+    "label":           ("auto_label_ollama",      "Auto-label prompts with a local Ollama model"),
+    "normalize":       ("normalize_step2",        "Normalize labeled outputs"),
+    "validate":        ("validate_step1",         "Validate the normalized dataset"),
+    "chat":            ("convert_step3_to_chat",  "Convert to chat format"),
+    "cache-tokenizer": ("tokenizer_cache",        "Save the filter tokenizer to a local tokenizer.json"),
+    "filter":          ("filter_step4_tokens",    "Drop samples over the token limit"),
+    "split":           ("split_step5_dataset",    "Split into train / val / test"),
+    "train":           ("train_lora_metal",       "Train the LoRA adapter"),
+    "evaluate":        ("evaluate_lora",          "Evaluate + benchmark an adapter on the test split"),
+    "export":          ("export_cpu",             "Merge the adapter and export quantized CPU artifacts"),
+    "prefix-bench":    ("prefix_cache",           "Benchmark shared-prefix KV cache reuse"),
+    "docx-bench":      ("docx_stream",            "Benchmark the streaming DOCX extractor"),
+}
+
+STARTUP_RUNS = 5
+
+
+def run_command(name, args):
+    module_name = COMMANDS[name][0]
+    module = importlib.import_module(module_name)
+
+    # Commands parse their own flags from sys.argv
+    sys.argv = [f"cli.py {name}"] + args
+    module.main()
+
+
+def measure_startup(runs=STARTUP_RUNS):
+    """Median cold-import time of each command's module in a fresh interpreter."""
+    print("\n========== COLD START REPORT ==========")
+
+    for name, (module_name, _) in COMMANDS.items():
+        code = (
+            "import time, importlib; t = time.perf_counter(); "
+            f"importlib.import_module('{module_name}'); print(time.perf_counter() - t)"
+        )
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+            wall = time.perf_counter() - start
+            if result.returncode != 0:
+                break
+            timings.append((float(result.stdout.strip().splitlines()[-1]), wall))
+
+        if not timings:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+            print(f"{name:<16}: ⚠️ {error}")
+            continue
+
+        timings.sort()
+        import_time, wall = timings[len(timings) // 2]
+        print(f"{name:<16}: import {import_time * 1000:7.1f} ms | process {wall * 1000:7.1f} ms")
+
+    print("=======================================\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Resume LLM pipeline",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {k:<16} {v[1]}" for k, v in COMMANDS.items())
+               + "\n  startup          Measure cold-start import time of every command",
+    )
+    parser.add_argument("command", choices=list(COMMANDS) + ["startup"], metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the command")
+    args = parser.parse_args()
+
+    if args.command == "startup":
+        measure_startup()
+        return
+
+    run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,55 @@
 import json
+import argparse
+
+from jsonl_reader import process_jsonl
 
 INPUT_FILE = "training_data_normalized.jsonl"
 OUTPUT_FILE = "training_data_chat.jsonl"
 
 SYSTEM_PROMPT = "You are an expert resume analyzer."
 
-with open(INPUT_FILE, "r", encoding="utf-8") as fin, \
-     open(OUTPUT_FILE, "w", encoding="utf-8") as fout:
-
-    for line in fin:
-        item = json.loads(line)
-
-        chat_item = {
-            "messages": [
-                {
-                    "role": "system",
-                    "content": SYSTEM_PROMPT
-                },
-                {
-                    "role": "user",
-                    "content": item["input"]
-                },
-                {
-                    "role": "assistant",
-                    "content": json.dumps(
-                        item["output"],
-                        ensure_ascii=False
-                    )
-                }
-            ]
-        }
-
-        fout.write(json.dumps(chat_item) + "\n")
-
-print("✅ Chat format conversion completed!")
+
+def convert_to_chat(item):
+    return {
+        "messages": [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": item["input"]
+            },
+            {
+                "role": "assistant",
+                "content": json.dumps(
+                    item["output"],
+                    ensure_ascii=False
+                )
+            }
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the normalized dataset to chat format.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    report = process_jsonl(
+        args.input,
+        schema="input_output",
+        transform=convert_to_chat,
+        output_path=args.output,
+        ensure_ascii=True          # \uXXXX escapes, as this step has always written
+    )
+
+    for line_number, error in report["errors"][:10]:
+        print(f"⚠️ Skipped line {line_number}: {error}")
+
+    print(f"✅ Chat format conversion completed! ({report['valid']} samples)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import os
+import re
+import argparse
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+P = W_NS + "p"
+T = W_NS + "t"
+TAB = W_NS + "tab"
+BR = W_NS + "br"
+CR = W_NS + "cr"
+TR = W_NS + "tr"
+TC = W_NS + "tc"
+FALLBACK = MC_NS + "Fallback"   # duplicate of the mc:Choice content (text boxes)
+
+CELL_SEPARATOR = " | "
+
+
+# ---------------------------------------------------------
+# Part discovery
+# ---------------------------------------------------------
+def _part_number(name):
+    match = re.search(r"(\d+)\.xml$", name)
+    return int(match.group(1)) if match else 0
+
+
+def docx_text_parts(names):
+    """Headers, then the body, then footers (each in numeric order)."""
+    headers = sorted((n for n in names if re.match(r"word/header\d*\.xml$", n)), key=_part_number)
+    footers = sorted((n for n in names if re.match(r"word/footer\d*\.xml$", n)), key=_part_number)
+    body = ["word/document.xml"] if "word/document.xml" in names else []
+    return headers + body + footers
+
+
+# ---------------------------------------------------------
+# Streaming parser for one WordprocessingML part
+# ---------------------------------------------------------
+def iter_part_lines(stream):
+    """Yield text lines in reading order: paragraphs, one line per table row,
+    and text-box paragraphs (emitted before the paragraph that anchors them)."""
+    para_stack = []     # text pieces of open paragraphs (text boxes nest paragraphs)
+    cell_stack = []     # paragraphs of open table cells
+    row_stack = []      # cells of open table rows
+    skip = 0            # depth inside mc:Fallback
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+
+        if event == "start":
+            if tag == FALLBACK:
+                skip += 1
+            elif skip:
+                continue
+            elif tag == P:
+                para_stack.append([])
+            elif tag == TC:
+                cell_stack.append([])
+            elif tag == TR:
+                row_stack.append([])
+            continue
+
+        if tag == FALLBACK:
+            skip -= 1
+            elem.clear()
+            continue
+        if skip:
+            continue
+
+        if tag == T:
+            if para_stack and elem.text:
+                para_stack[-1].append(elem.text)
+        elif tag == TAB:
+            if para_stack:
+                para_stack[-1].append("\t")
+        elif tag in (BR, CR):
+            if para_stack:
+                para_stack[-1].append("\n")
+        elif tag == P:
+            text = "".join(para_stack.pop())
+            if cell_stack:
+                cell_stack[-1].append(text)
+            elif text.strip():
+                yield text
+            elem.clear()
+        elif tag == TC:
+            cell = " ".join(p for p in cell_stack.pop() if p.strip())
+            if row_stack:
+                row_stack[-1].append(cell)
+            elem.clear()
+        elif tag == TR:
+            row = CELL_SEPARATOR.join(c for c in row_stack.pop() if c)
+            if cell_stack:
+                cell_stack[-1].append(row)       # nested table
+            elif row:
+                yield row
+            elem.clear()
+
+
+def extract_docx_text(path):
+    """Extract text from headers, body (paragraphs + tables + text boxes) and footers."""
+    lines = []
+
+    with zipfile.ZipFile(path) as zf:
+        for part in docx_text_parts(zf.namelist()):
+            with zf.open(part) as stream:
+                lines.extend(iter_part_lines(stream))
+
+    return "\n".join(lines).strip()
+
+
+# ---------------------------------------------------------
+# Benchmark vs. python-docx (doc.paragraphs only)
+# ---------------------------------------------------------
+def extract_with_python_docx(path):
+    from docx import Document
+    doc = Document(path)
+    return "\n".join(p.text for p in doc.paragraphs).strip()
+
+
+def _words(text):
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming DOCX extractor against python-docx.")
+    parser.add_argument("root", nargs="?", default="data", help="folder searched for .docx files")
+    root = parser.parse_args().root
+
+    files = [
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+        if name.lower().endswith(".docx")
+    ]
+
+    if not files:
+        print(f"❌ No .docx files found under {root}")
+        return
+
+    timings = {"python-docx": 0.0, "stream": 0.0}
+    chars = {"python-docx": 0, "stream": 0}
+    missed_by_stream = 0
+    extra_in_stream = 0
+    failed = 0
+
+    for path in files:
+        try:
+            start = time.perf_counter()
+            old = extract_with_python_docx(path)
+            timings["python-docx"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            new = extract_docx_text(path)
+            timings["stream"] += time.perf_counter() - start
+        except Exception as e:
+            print(f"⚠️ {path}: {e}")
+            failed += 1
+            continue
+
+        chars["python-docx"] += len(old)
+        chars["stream"] += len(new)
+
+        old_words, new_words = _words(old), _words(new)
+        missed_by_stream += len(old_words - new_words)
+        extra_in_stream += len(new_words - old_words)
+
+    done = len(files) - failed
+    print("\n========== DOCX EXTRACTION BENCHMARK ==========")
+    print(f"Files                   : {done} ({failed} failed)")
+    for name in timings:
+        print(f"{name:<12} time      : {timings[name]:.2f}s ({timings[name] / max(done, 1) * 1000:.1f} ms/file)")
+        print(f"{name:<12} chars     : {chars[name]}")
+    print(f"Speedup                 : {timings['python-docx'] / max(timings['stream'], 1e-9):.1f}x")
+    print(f"Distinct words only in stream      : {extra_in_stream}")
+    print(f"Distinct words missed by stream    : {missed_by_stream}")
+    print("===============================================\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+import os
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+import json
+import re
+import time
+import argparse
+from datetime import datetime
+
+import torch
+from transformers import AutoTokenizer, AutoModelForCausalLM, StoppingCriteria, StoppingCriteriaList
+from peft import PeftModel
+
+from generate_training_data import PROMPT_SUFFIX, build_prompt_prefix
+from prefix_cache import (
+    PrefixKVCache, chat_prefix, generate_with_prefix, generate_without_prefix, split_user_prompt
+)
+from jsonl_reader import REQUIRED_OUTPUT_KEYS
+from settings import SETTINGS
+
+# ===============================
+# CONFIG
+# ===============================
+BASE_MODEL = SETTINGS["base_model"]
+ADAPTER_DIR = SETTINGS["adapter_dir"]  # "none" → evaluate the base model only
+
+TEST_FILE = "training_data_test.jsonl"
+RESULTS_DIR = "eval_results"
+HISTORY_FILE = os.path.join(RESULTS_DIR, "history.jsonl")
+
+EVAL_BATCH_SIZE = 8                    # batch size for the quality pass
+BENCH_BATCH_SIZES = [1, 4, 8]          # batch sizes for the speed benchmark
+BENCH_SAMPLES = 32                     # test samples per batch size
+MAX_NEW_TOKENS = 512
+MAX_PROMPT_LENGTH = 768                # same as MAX_LENGTH in train_lora_metal.py
+PROMPT_MARGIN = 8                      # slack for re-tokenizing a cut resume body
+
+
+# ---------------------------------------------------------
+# Dataset (chat format written by split_step5_dataset.py)
+# ---------------------------------------------------------
+def load_test_parts(path, limit=None):
+    """Return (role, head, body, tail, reference) tuples from the chat-format test split.
+
+    head + body + tail is the full prompt; body is the resume text (the only
+    part that may be shortened to fit MAX_PROMPT_LENGTH). role is None when
+    the user turn is not in the build_training_pair layout.
+    """
+    samples = []
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            item = json.loads(line)
+
+            # Same "ROLE: content" layout used by tokenize() in train_lora_metal.py
+            role = None
+            head = ""
+            body = ""
+            tail = ""
+            reference = ""
+            for msg in item["messages"]:
+                if msg["role"] == "assistant":
+                    reference = msg["content"]
+                elif msg["role"] == "user":
+                    role, resume_text = split_user_prompt(msg["content"])
+                    if role is not None:
+                        head += f"USER: {build_prompt_prefix(role)}"
+                        body = resume_text
+                        tail = f"{PROMPT_SUFFIX}\n"
+                    else:
+                        head += "USER: "
+                        body = msg["content"]
+                        tail = "\n"
+                else:
+                    head += f"{msg['role'].upper()}: {msg['content']}\n"
+            tail += "ASSISTANT: "
+
+            samples.append((role, head, body, tail, reference))
+
+            if limit and len(samples) >= limit:
+                break
+
+    return samples
+
+
+def load_test_samples(path, limit=None):
+    """Return (prompt, reference) pairs from the chat-format test split."""
+    return [(head + body + tail, reference) for _, head, body, tail, reference in load_test_parts(path, limit)]
+
+
+def fit_prompt(tokenizer, head, body, tail, max_length=MAX_PROMPT_LENGTH):
+    """Return (prompt, shortened): cut only the resume body so the prompt fits.
+
+    The instruction suffix and the trailing "ASSISTANT: " cue are always kept.
+    """
+    prompt = head + body + tail
+    if len(tokenizer(prompt).input_ids) <= max_length:
+        return prompt, False
+
+    budget = max(0, max_length - len(tokenizer(head + tail).input_ids) - PROMPT_MARGIN)
+    body_ids = tokenizer(body, add_special_tokens=False).input_ids[:budget]
+    body = tokenizer.decode(body_ids, skip_special_tokens=True)
+
+    # Decoding and re-encoding can shift token boundaries; trim until it fits
+    while body and len(tokenizer(head + body + tail).input_ids) > max_length:
+        body = body[:int(len(body) * 0.95)]
+
+    return head + body + tail, True
+
+
+# ---------------------------------------------------------
+# Quality metrics
+# ---------------------------------------------------------
+def parse_prediction(text):
+    """Return (parsed_json_or_None, strictly_valid)."""
+    try:
+        parsed = json.loads(text.strip())
+        if isinstance(parsed, dict):
+            return parsed, True
+    except Exception:
+        pass
+
+    # Same recovery as extract_json() in auto_label_ollama.py
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
+        try:
+            parsed = json.loads(match.group())
+            if isinstance(parsed, dict):
+                return parsed, False
+        except Exception:
+            pass
+
+    return None, False
+
+
+def field_to_text(value):
+    """Flatten a str / list / dict output field into plain text."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return " ".join(field_to_text(v) for v in value)
+    if isinstance(value, dict):
+        return " ".join(f"{k} {field_to_text(v)}" for k, v in value.items())
+    return str(value)
+
+
+def token_f1(prediction, reference):
+    """Bag-of-words F1 between two strings (1.0 when both are empty)."""
+    pred_tokens = re.findall(r"\w+", prediction.lower())
+    ref_tokens = re.findall(r"\w+", reference.lower())
+
+    if not pred_tokens and not ref_tokens:
+        return 1.0
+    if not pred_tokens or not ref_tokens:
+        return 0.0
+
+    ref_counts = {}
+    for tok in ref_tokens:
+        ref_counts[tok] = ref_counts.get(tok, 0) + 1
+
+    common = 0
+    for tok in pred_tokens:
+        if ref_counts.get(tok, 0) > 0:
+            ref_counts[tok] -= 1
+            common += 1
+
+    if common == 0:
+        return 0.0
+
+    precision = common / len(pred_tokens)
+    recall = common / len(ref_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+def score_predictions(predictions, references):
+    total = len(predictions)
+    strict_valid = 0
+    recoverable = 0
+    key_hits = 0
+    field_scores = {key: 0.0 for key in REQUIRED_OUTPUT_KEYS}
+
+    for prediction, reference in zip(predictions, references):
+        parsed, strict = parse_prediction(prediction)
+        expected = json.loads(reference)
+
+        if strict:
+            strict_valid += 1
+        if parsed is not None:
+            recoverable += 1
+        else:
+            parsed = {}
+
+        for key in REQUIRED_OUTPUT_KEYS:
+            if key in parsed:
+                key_hits += 1
+            field_scores[key] += token_f1(
+                field_to_text(parsed.get(key)),
+                field_to_text(expected.get(key))
+            )
+
+    if total == 0:
+        return {}
+
+    return {
+        "samples": total,
+        "json_valid_rate": strict_valid / total,
+        "json_recoverable_rate": recoverable / total,
+        "required_key_coverage": key_hits / (total * len(REQUIRED_OUTPUT_KEYS)),
+        "field_similarity": {k: v / total for k, v in field_scores.items()},
+        "mean_field_similarity": sum(field_scores.values()) / (total * len(REQUIRED_OUTPUT_KEYS)),
+    }
+
+
+# ---------------------------------------------------------
+# Model loading
+# ---------------------------------------------------------
+def pick_device():
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def load_model(base_model, adapter_dir, device):
+    tokenizer = AutoTokenizer.from_pretrained(base_model)
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"   # required for batched generation
+
+    model = AutoModelForCausalLM.from_pretrained(
+        base_model,
+        dtype=torch.float16 if device != "cpu" else torch.float32,
+        device_map={"": device},
+        low_cpu_mem_usage=True,
+        attn_implementation="eager"
+    )
+
+    if adapter_dir and adapter_dir.lower() != "none":
+        model = PeftModel.from_pretrained(model, adapter_dir)
+
+    model.eval()
+    return tokenizer, model
+
+
+# ---------------------------------------------------------
+# Batched generation with timing
+# ---------------------------------------------------------
+class FirstTokenTimer(StoppingCriteria):
+    """Records when the first new token of a batch is produced."""
+
+    def __init__(self, device):
+        self.device = device
+        self.first_token_at = None
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if self.first_token_at is None:
+            # generate() calls this right after queueing prefill + argmax;
+            # wait for the GPU so the token actually exists
+            sync(self.device)
+            self.first_token_at = time.perf_counter()
+        return False
+
+
+def sync(device):
+    if device == "cuda":
+        torch.cuda.synchronize()
+    elif device == "mps":
+        torch.mps.synchronize()
+
+
+def generate_batch(tokenizer, model, prompts, device):
+    # Prompts are already fitted by fit_prompt(); no truncation of the tail here
+    encoded = tokenizer(
+        prompts,
+        return_tensors="pt",
+        padding=True
+    ).to(device)
+
+    timer = FirstTokenTimer(device)
+    sync(device)
+    start = time.perf_counter()
+
+    with torch.no_grad():
+        output_ids = model.generate(
+            **encoded,
+            max_new_tokens=MAX_NEW_TOKENS,
+            do_sample=False,
+            pad_token_id=tokenizer.eos_token_id,
+            stopping_criteria=StoppingCriteriaList([timer])
+        )
+
+    sync(device)
+    end = time.perf_counter()
+
+    prompt_len = encoded["input_ids"].shape[1]
+    new_ids = output_ids[:, prompt_len:]
+
+    texts = tokenizer.batch_decode(new_ids, skip_special_tokens=True)
+
+    # Count only real tokens (padding after EOS is not generated work)
+    gen_tokens = int((new_ids != tokenizer.pad_token_id).sum().item())
+    prompt_tokens = int(encoded["attention_mask"].sum().item())
+
+    first_token_at = timer.first_token_at or end
+    return texts, {
+        "latency": end - start,
+        "ttft": first_token_at - start,
+        "prompt_tokens": prompt_tokens,
+        "gen_tokens": gen_tokens,
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_benchmark(tokenizer, model, prompts, batch_size, device):
+    # Warm-up (kernel compilation / allocator) is excluded from the numbers
+    generate_batch(tokenizer, model, prompts[:batch_size], device)
+
+    latencies = []
+    ttfts = []
+    prefill_time = 0.0
+    decode_time = 0.0
+    prompt_tokens = 0
+    gen_tokens = 0
+
+    for i in range(0, len(prompts), batch_size):
+        _, stats = generate_batch(tokenizer, model, prompts[i:i + batch_size], device)
+
+        latencies.append(stats["latency"])
+        ttfts.append(stats["ttft"])
+        prefill_time += stats["ttft"]
+        decode_time += stats["latency"] - stats["ttft"]
+        prompt_tokens += stats["prompt_tokens"]
+        gen_tokens += stats["gen_tokens"]
+
+    return {
+        "batch_size": batch_size,
+        "batches": len(latencies),
+        "prompt_tokens_per_sec": prompt_tokens / prefill_time if prefill_time > 0 else 0.0,
+        "gen_tokens_per_sec": gen_tokens / decode_time if decode_time > 0 else 0.0,
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p95": percentile(ttfts, 95),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+    }
+
+
+# ---------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a LoRA adapter on the test split.")
+    parser.add_argument("--base-model", default=BASE_MODEL)
+    parser.add_argument("--adapter", default=ADAPTER_DIR)
+    parser.add_argument("--test-file", default=TEST_FILE)
+    parser.add_argument("--limit", type=int, default=None, help="evaluate only the first N samples")
+    parser.add_argument("--tag", default=None, help="label stored with the results (e.g. lora-v2)")
+    parser.add_argument("--skip-bench", action="store_true")
+    parser.add_argument(
+        "--prefix-cache",
+        action="store_true",
+        help="quality pass at batch size 1, reusing the KV state of each role's shared prompt prefix"
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.test_file):
+        print(f"❌ {args.test_file} not found. Run split_step5_dataset.py first.")
+        return
+
+    samples = load_test_parts(args.test_file, args.limit)
+    references = [s[4] for s in samples]
+    print(f"📦 Test samples: {len(samples)}")
+
+    device = pick_device()
+    print(f"⚙️ Loading {args.base_model} + adapter '{args.adapter}' on {device}")
+    tokenizer, model = load_model(args.base_model, args.adapter, device)
+
+    prompts = []
+    shortened = 0
+    for _, head, body, tail, _ in samples:
+        prompt, was_shortened = fit_prompt(tokenizer, head, body, tail)
+        prompts.append(prompt)
+        shortened += was_shortened
+    print(f"✂️ Shortened resume body in {shortened} prompts (limit {MAX_PROMPT_LENGTH} tokens)")
+
+    # ---------- Quality pass ----------
+    predictions = []
+    start_time = time.time()
+
+    if args.prefix_cache:
+        prefix_cache = PrefixKVCache(model, tokenizer)
+
+        for (role, head, _, _, _), prompt in zip(samples, prompts):
+            if role is not None and head == chat_prefix(role):
+                text = generate_with_prefix(prefix_cache, role, prompt, max_new_tokens=MAX_NEW_TOKENS)
+            else:
+                prefix_cache.fallbacks += 1
+                text = generate_without_prefix(model, tokenizer, prompt, max_new_tokens=MAX_NEW_TOKENS)
+            predictions.append(text)
+
+            done = len(predictions)
+            elapsed = time.time() - start_time
+            print(f"✔ {done}/{len(prompts)} | {done / elapsed:.2f} samples/sec")
+    else:
+        for i in range(0, len(prompts), EVAL_BATCH_SIZE):
+            texts, _ = generate_batch(tokenizer, model, prompts[i:i + EVAL_BATCH_SIZE], device)
+            predictions.extend(texts)
+
+            done = len(predictions)
+            elapsed = time.time() - start_time
+            print(f"✔ {done}/{len(prompts)} | {done / elapsed:.2f} samples/sec")
+
+    quality_seconds = time.time() - start_time
+
+    quality = score_predictions(predictions, references)
+
+    # ---------- Speed benchmark ----------
+    benchmarks = []
+    if not args.skip_bench:
+        bench_prompts = prompts[:BENCH_SAMPLES]
+        for batch_size in BENCH_BATCH_SIZES:
+            print(f"⏱ Benchmarking batch size {batch_size}")
+            benchmarks.append(run_benchmark(tokenizer, model, bench_prompts, batch_size, device))
+
+    # ---------- Save ----------
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    tag = args.tag or os.path.basename(os.path.normpath(args.adapter))
+
+    result = {
+        "run_id": run_id,
+        "tag": tag,
+        "base_model": args.base_model,
+        "adapter": args.adapter,
+        "test_file": args.test_file,
+        "device": device,
+        "max_new_tokens": MAX_NEW_TOKENS,
+        "max_prompt_length": MAX_PROMPT_LENGTH,
+        "prompts_shortened": shortened,
+        "quality": quality,
+        "quality_pass_seconds": quality_seconds,
+        "prefix_cache": prefix_cache.stats() if args.prefix_cache else None,
+        "benchmarks": benchmarks,
+    }
+
+    result_file = os.path.join(RESULTS_DIR, f"{run_id}_{tag}.json")
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    predictions_file = os.path.join(RESULTS_DIR, f"{run_id}_{tag}_predictions.jsonl")
+    with open(predictions_file, "w", encoding="utf-8") as f:
+        for prediction, reference in zip(predictions, references):
+            f.write(json.dumps({"prediction": prediction, "reference": reference}, ensure_ascii=False) + "\n")
+
+    # One line per run → easy to diff model versions
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+    print("\n========== EVALUATION REPORT ==========")
+    print(f"Samples               : {quality.get('samples', 0)}")
+    print(f"Prompts shortened     : {shortened}")
+    print(f"Quality pass time     : {quality_seconds:.1f}s")
+    if args.prefix_cache:
+        print(f"Prefix cache          : {prefix_cache.stats()}")
+    print(f"JSON valid rate       : {quality.get('json_valid_rate', 0):.3f}")
+    print(f"JSON recoverable rate : {quality.get('json_recoverable_rate', 0):.3f}")
+    print(f"Required key coverage : {quality.get('required_key_coverage', 0):.3f}")
+    for key, score in quality.get("field_similarity", {}).items():
+        print(f"  {key:<20}: {score:.3f}")
+
+    for bench in benchmarks:
+        print(
+            f"\nBatch {bench['batch_size']:>2} | "
+            f"prompt {bench['prompt_tokens_per_sec']:.1f} tok/s | "
+            f"gen {bench['gen_tokens_per_sec']:.1f} tok/s | "
+            f"TTFT p50 {bench['ttft_p50']:.2f}s | "
+            f"latency p50 {bench['latency_p50']:.2f}s p95 {bench['latency_p95']:.2f}s"
+        )
+
+    print(f"\n📁 Saved: {result_file}")
+    print("=======================================\n")
+
+
+if __name__ == "__main__":
+    main()
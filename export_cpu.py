@@ -0,0 +1,352 @@
+import os
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+from transformers import AutoTokenizer, AutoModelForCausalLM
+from peft import PeftModel
+
+from convert_step3_to_chat import SYSTEM_PROMPT
+from evaluate_lora import load_test_samples, token_f1
+from settings import SETTINGS
+
+# ===============================
+# CONFIG
+# ===============================
+BASE_MODEL = SETTINGS["base_model"]
+ADAPTER_DIR = SETTINGS["adapter_dir"]  # OUTPUT_DIR of train_lora_metal.py
+
+EXPORT_DIR = "./resume-model-export"
+MERGED_DIR = os.path.join(EXPORT_DIR, "merged-fp16")
+INT8_DIR = os.path.join(EXPORT_DIR, "int8")
+GGUF_DIR = os.path.join(EXPORT_DIR, "gguf")
+
+# llama.cpp checkout (convert_hf_to_gguf.py + llama-quantize) for GGUF / Ollama export
+LLAMA_CPP_DIR = os.environ.get("LLAMA_CPP_DIR", "llama.cpp")
+GGUF_QUANTS = ["Q8_0", "Q4_K_M"]
+
+TEST_FILE = "training_data_test.jsonl"
+BENCH_PROMPTS = 8
+BENCH_MAX_NEW_TOKENS = 128
+BENCH_THREADS = max(1, multiprocessing.cpu_count() - 2)
+
+
+# ---------------------------------------------------------
+# Step 1: Merge LoRA adapter into base weights
+# ---------------------------------------------------------
+def mark_config_fp16(model_dir):
+    """save_pretrained() records the in-memory (fp32) dtype; the saved weights are fp16."""
+    config_file = os.path.join(model_dir, "config.json")
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    config["dtype"] = "float16"
+    if "torch_dtype" in config:          # key used by transformers < 5
+        config["torch_dtype"] = "float16"
+
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+def merge_adapter(base_model, adapter_dir):
+    """Merge on CPU in fp32 (exact), save fp16 safetensors, return the fp32 model."""
+    print(f"🔗 Merging {adapter_dir} into {base_model}")
+
+    model = AutoModelForCausalLM.from_pretrained(
+        base_model,
+        dtype=torch.float32,
+        low_cpu_mem_usage=True
+    )
+    model = PeftModel.from_pretrained(model, adapter_dir)
+    model = model.merge_and_unload()
+    model.eval()
+
+    fp16_state = {k: v.to(torch.float16) for k, v in model.state_dict().items()}
+    model.save_pretrained(MERGED_DIR, state_dict=fp16_state, safe_serialization=True)
+    del fp16_state
+    mark_config_fp16(MERGED_DIR)
+
+    tokenizer = AutoTokenizer.from_pretrained(adapter_dir)
+    tokenizer.save_pretrained(MERGED_DIR)
+
+    print(f"📁 Saved: {MERGED_DIR}")
+    return model, tokenizer
+
+
+# ---------------------------------------------------------
+# Step 2: int8 dynamic quantization (pure PyTorch, CPU)
+# ---------------------------------------------------------
+def select_quantized_engine():
+    """x86 / fbgemm on Intel & AMD, qnnpack on ARM (Apple Silicon, Linux / Windows ARM)."""
+    supported = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    raise RuntimeError(f"No int8 quantized engine available (supported: {supported})")
+
+
+def export_int8(model, tokenizer):
+    """Quantize nn.Linear weights to int8; activations are quantized per batch at runtime."""
+    print("🧮 Quantizing merged model to int8")
+
+    print(f"⚙️ Quantized engine: {select_quantized_engine()}")
+    quantized = torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+        inplace=True
+    )
+
+    os.makedirs(INT8_DIR, exist_ok=True)
+    torch.save(quantized, os.path.join(INT8_DIR, "model.pt"))
+    tokenizer.save_pretrained(INT8_DIR)
+
+    print(f"📁 Saved: {INT8_DIR}")
+
+
+# ---------------------------------------------------------
+# Step 3: GGUF export (int8 / int4) for llama.cpp and Ollama
+# ---------------------------------------------------------
+def find_llama_quantize():
+    for candidate in [
+        os.path.join(LLAMA_CPP_DIR, "build", "bin", "llama-quantize"),
+        os.path.join(LLAMA_CPP_DIR, "llama-quantize"),
+    ]:
+        if os.path.exists(candidate) or os.path.exists(candidate + ".exe"):
+            return candidate
+    return shutil.which("llama-quantize")
+
+
+def export_gguf():
+    convert_script = os.path.join(LLAMA_CPP_DIR, "convert_hf_to_gguf.py")
+    quantize_bin = find_llama_quantize()
+
+    if not os.path.exists(convert_script) or not quantize_bin:
+        print(f"⚠️ llama.cpp not found at {LLAMA_CPP_DIR} (set LLAMA_CPP_DIR) — skipping GGUF export")
+        return []
+
+    os.makedirs(GGUF_DIR, exist_ok=True)
+    f16_file = os.path.join(GGUF_DIR, "resume-model-f16.gguf")
+
+    print("📦 Converting merged model to GGUF (f16)")
+    subprocess.run(
+        [sys.executable, convert_script, MERGED_DIR, "--outfile", f16_file, "--outtype", "f16"],
+        check=True
+    )
+
+    outputs = []
+    for quant in GGUF_QUANTS:
+        out_file = os.path.join(GGUF_DIR, f"resume-model-{quant}.gguf")
+        print(f"🧮 Quantizing GGUF → {quant}")
+        subprocess.run([quantize_bin, f16_file, out_file, quant], check=True)
+        outputs.append((quant, out_file))
+
+    os.remove(f16_file)
+
+    # Ollama: `ollama create resume-model -f <GGUF_DIR>/Modelfile`
+    # TEMPLATE mirrors the "SYSTEM/USER/ASSISTANT" layout of tokenize() in train_lora_metal.py
+    smallest = outputs[-1][1]
+    with open(os.path.join(GGUF_DIR, "Modelfile"), "w", encoding="utf-8") as f:
+        f.write(f"FROM ./{os.path.basename(smallest)}\n")
+        f.write('TEMPLATE """SYSTEM: {{ .System }}\nUSER: {{ .Prompt }}\nASSISTANT: """\n')
+        f.write(f'SYSTEM "{SYSTEM_PROMPT}"\n')
+        f.write("PARAMETER temperature 0\n")
+        f.write('PARAMETER stop "USER:"\n')
+        f.write('PARAMETER stop "SYSTEM:"\n')
+
+    print(f"📁 Saved: {GGUF_DIR}")
+    return outputs
+
+
+# ---------------------------------------------------------
+# Benchmark (each variant in a fresh process → clean RSS)
+# ---------------------------------------------------------
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KiB on Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def load_variant(variant, path):
+    if variant == "fp16-unmerged":
+        tokenizer = AutoTokenizer.from_pretrained(path)
+        model = AutoModelForCausalLM.from_pretrained(
+            BASE_MODEL, dtype=torch.float16, low_cpu_mem_usage=True
+        )
+        model = PeftModel.from_pretrained(model, path)
+    elif variant == "merged-fp16":
+        tokenizer = AutoTokenizer.from_pretrained(path)
+        model = AutoModelForCausalLM.from_pretrained(
+            path, dtype=torch.float16, low_cpu_mem_usage=True
+        )
+    elif variant == "merged-int8":
+        select_quantized_engine()
+        tokenizer = AutoTokenizer.from_pretrained(path)
+        model = torch.load(os.path.join(path, "model.pt"), weights_only=False)
+    else:
+        raise ValueError(f"Unknown variant: {variant}")
+
+    model.eval()
+    return tokenizer, model
+
+
+def bench_variant(variant, path, prompts):
+    torch.set_num_threads(BENCH_THREADS)
+
+    start = time.perf_counter()
+    gguf = variant.startswith("gguf-")
+
+    if gguf:
+        from llama_cpp import Llama
+        llm = Llama(model_path=path, n_ctx=4096, n_threads=BENCH_THREADS, verbose=False)
+    else:
+        tokenizer, model = load_variant(variant, path)
+
+    load_time = time.perf_counter() - start
+    load_rss = peak_rss_mb()
+
+    outputs = []
+    gen_tokens = 0
+    gen_time = 0.0
+
+    for prompt in prompts:
+        start = time.perf_counter()
+
+        if gguf:
+            result = llm(prompt, max_tokens=BENCH_MAX_NEW_TOKENS, temperature=0.0)
+            text = result["choices"][0]["text"]
+            n_new = result["usage"]["completion_tokens"]
+        else:
+            encoded = tokenizer(prompt, return_tensors="pt")
+            with torch.no_grad():
+                output_ids = model.generate(
+                    **encoded,
+                    max_new_tokens=BENCH_MAX_NEW_TOKENS,
+                    do_sample=False,
+                    pad_token_id=tokenizer.eos_token_id
+                )
+            new_ids = output_ids[0, encoded["input_ids"].shape[1]:]
+            text = tokenizer.decode(new_ids, skip_special_tokens=True)
+            n_new = len(new_ids)
+
+        gen_time += time.perf_counter() - start
+        gen_tokens += n_new
+        outputs.append(text)
+
+    return {
+        "variant": variant,
+        "path": path,
+        "load_time_s": load_time,
+        "load_rss_mb": load_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "tokens_per_sec": gen_tokens / gen_time if gen_time > 0 else 0.0,
+        "outputs": outputs,
+    }
+
+
+def run_benchmarks(variants, prompts):
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+
+    for variant, path in variants:
+        print(f"⏱ Benchmarking {variant}")
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            try:
+                results.append(executor.submit(bench_variant, variant, path, prompts).result())
+            except Exception as e:
+                print(f"❌ {variant} failed: {e}")
+
+    if not results or results[0]["variant"] != "fp16-unmerged":
+        return results
+
+    # Output agreement vs. the unmerged fp16 reference
+    reference = results[0]["outputs"]
+    for result in results:
+        pairs = list(zip(result["outputs"], reference))
+        result["exact_match_rate"] = sum(a.strip() == b.strip() for a, b in pairs) / len(pairs)
+        result["token_f1_vs_fp16"] = sum(token_f1(a, b) for a, b in pairs) / len(pairs)
+
+    return results
+
+
+# ---------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Merge the LoRA adapter and export CPU artifacts.")
+    parser.add_argument("--adapter", default=ADAPTER_DIR)
+    parser.add_argument("--skip-gguf", action="store_true")
+    parser.add_argument("--skip-bench", action="store_true")
+    parser.add_argument("--bench-only", action="store_true", help="benchmark existing exports")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.adapter):
+        print(f"❌ Adapter not found: {args.adapter}. Run train_lora_metal.py first.")
+        return
+
+    if not args.bench_only:
+        model, tokenizer = merge_adapter(BASE_MODEL, args.adapter)
+        export_int8(model, tokenizer)
+        del model
+        gc.collect()
+
+        if not args.skip_gguf:
+            export_gguf()
+
+    if args.skip_bench:
+        return
+
+    variants = [
+        ("fp16-unmerged", args.adapter),
+        ("merged-fp16", MERGED_DIR),
+        ("merged-int8", INT8_DIR),
+    ]
+
+    try:
+        import llama_cpp  # noqa: F401
+        for quant in GGUF_QUANTS:
+            gguf_file = os.path.join(GGUF_DIR, f"resume-model-{quant}.gguf")
+            if os.path.exists(gguf_file):
+                variants.append((f"gguf-{quant}", gguf_file))
+    except ImportError:
+        print("⚠️ llama-cpp-python not installed — GGUF files will not be benchmarked")
+
+    prompts = [p for p, _ in load_test_samples(TEST_FILE, BENCH_PROMPTS)]
+    results = run_benchmarks(variants, prompts)
+
+    report_file = os.path.join(EXPORT_DIR, "benchmark.json")
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print("\n========== CPU EXPORT BENCHMARK ==========")
+    print(f"{'variant':<16}{'load s':>8}{'peak MB':>10}{'tok/s':>8}{'exact':>8}{'F1':>7}")
+    for r in results:
+        print(
+            f"{r['variant']:<16}{r['load_time_s']:>8.1f}{r['peak_rss_mb']:>10.0f}"
+            f"{r['tokens_per_sec']:>8.2f}{r.get('exact_match_rate', 0):>8.2f}"
+            f"{r.get('token_f1_vs_fp16', 0):>7.2f}"
+        )
+    if any(r["variant"].startswith("gguf-") for r in results):
+        print("\nℹ️ gguf-* rows feed the raw prompt to llama-cpp; the Modelfile TEMPLATE used by Ollama is not exercised")
+    print(f"\n📁 Saved: {report_file}")
+    print("==========================================\n")
+
+
+if __name__ == "__main__":
+    main()
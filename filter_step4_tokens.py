@@ -1,44 +1,57 @@
 import json
-from transformers import AutoTokenizer
+import argparse
+
+from settings import SETTINGS
 
 INPUT_FILE = "training_data_chat.jsonl"
 OUTPUT_FILE = "training_data_chat_filtered.jsonl"
 
-MODEL_NAME = "mistralai/Mistral-7B-v0.1"
-MAX_TOKENS = 4096
+MAX_TOKENS = SETTINGS["max_tokens"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop chat samples over the token limit.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    args = parser.parse_args()
+
+    from tokenizer_cache import load_tokenizer
+
+    # Pre-serialized tokenizer.json (see tokenizer_cache.py) → no transformers import
+    tokenizer = load_tokenizer()
+
+    kept = 0
+    dropped = 0
+    max_seen = 0
 
-tokenizer = AutoTokenizer.from_pretrained(
-    MODEL_NAME,
-    use_fast=True
-)
+    with open(args.input, "r", encoding="utf-8") as fin, \
+         open(args.output, "w", encoding="utf-8") as fout:
 
-kept = 0
-dropped = 0
-max_seen = 0
+        for line in fin:
+            item = json.loads(line)
 
-with open(INPUT_FILE, "r", encoding="utf-8") as fin, \
-     open(OUTPUT_FILE, "w", encoding="utf-8") as fout:
+            # Combine all message contents
+            full_text = ""
+            for msg in item["messages"]:
+                full_text += msg["content"] + "\n"
 
-    for line in fin:
-        item = json.loads(line)
+            token_count = len(tokenizer.encode(full_text).ids)
+            max_seen = max(max_seen, token_count)
 
-        # Combine all message contents
-        full_text = ""
-        for msg in item["messages"]:
-            full_text += msg["content"] + "\n"
+            if token_count <= args.max_tokens:
+                fout.write(json.dumps(item, ensure_ascii=False) + "\n")
+                kept += 1
+            else:
+                dropped += 1
 
-        token_count = len(tokenizer(full_text)["input_ids"])
-        max_seen = max(max_seen, token_count)
+    print("\n========== TOKEN FILTER REPORT ==========")
+    print(f"Kept samples     : {kept}")
+    print(f"Dropped samples  : {dropped}")
+    print(f"Max tokens seen  : {max_seen}")
+    print(f"Token limit used : {args.max_tokens}")
+    print("========================================\n")
 
-        if token_count <= MAX_TOKENS:
-            fout.write(json.dumps(item, ensure_ascii=False) + "\n")
-            kept += 1
-        else:
-            dropped += 1
 
-print("\n========== TOKEN FILTER REPORT ==========")
-print(f"Kept samples     : {kept}")
-print(f"Dropped samples  : {dropped}")
-print(f"Max tokens seen  : {max_seen}")
-print(f"Token limit used : {MAX_TOKENS}")
-print("========================================\n")
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
 import os
 import json
 import re
+import argparse
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 
-MANIFEST_FILE = "extracted_texts/manifest.jsonl"
+from settings import SETTINGS
+
+MANIFEST_FILE = os.path.join(SETTINGS["extract_dir"], "manifest.jsonl")
 OUTPUT_FILE = "training_data.jsonl"
+QUARANTINE_FILE = "training_data_quarantine.jsonl"
+
+MIN_TEXT_CHARS = 100
+
+# Labeling cost per resume for the "time saved" estimate: measured by the last
+# auto_label_ollama.py run when available, else the label_seconds_per_resume setting
+LABEL_STATS_FILE = "labeling_stats.json"
+LABEL_SECONDS_PER_RESUME = SETTINGS["label_seconds_per_resume"]
 
 # ---------- CLEANING ----------
 
@@ -19,18 +30,30 @@ def clean_text(text):
 
 # ---------- TRAINING EXAMPLE BUILDER ----------
 
-def build_training_pair(role, resume_text):
-    """Build an LLM training pair with task-specific fields."""
+# Bump whenever the prompt text below changes (keys cached prefix KV states)
+PROMPT_VERSION = "v1"
 
-    input_prompt = (
+PROMPT_SUFFIX = (
+    "\n\nReturn improvements in structured JSON with keys: "
+    "'grammar', 'skills', 'experience', 'projects', 'overall_summary'."
+)
+
+
+def build_prompt_prefix(role):
+    """Fixed part of the prompt before the resume body (shared by every resume of a role)."""
+    return (
         f"You are an expert resume analyzer. "
         f"Here is a resume for the role '{role}'. "
         f"Analyze it and provide improvements.\n\n"
-        f"RESUME:\n{resume_text}\n\n"
-        f"Return improvements in structured JSON with keys: "
-        f"'grammar', 'skills', 'experience', 'projects', 'overall_summary'."
+        f"RESUME:\n"
     )
 
+
+def build_training_pair(role, resume_text):
+    """Build an LLM training pair with task-specific fields."""
+
+    input_prompt = build_prompt_prefix(role) + resume_text + PROMPT_SUFFIX
+
     output_placeholder = {
         "grammar": "",
         "skills": "",
@@ -53,25 +76,72 @@ def process_manifest_line(line):
     role = entry.get("role", "")
     text = clean_text(entry.get("text", ""))
 
-    if len(text) < 100:
+    if len(text) < MIN_TEXT_CHARS:
         return None
 
     return build_training_pair(role, text)
 
 
+def label_seconds_per_resume():
+    """Return (seconds, source) used to estimate the labeling time saved."""
+    if os.path.exists(LABEL_STATS_FILE):
+        with open(LABEL_STATS_FILE, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+        return stats["seconds_per_resume"], f"measured over {stats['resumes']} resumes"
+    return LABEL_SECONDS_PER_RESUME, "label_seconds_per_resume setting"
+
+
 # ---------- MAIN (MULTIPROCESSING) ----------
 
 def main():
-    if not os.path.exists(MANIFEST_FILE):
+    parser = argparse.ArgumentParser(description="Build training prompts from the extraction manifest.")
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--quarantine", default=QUARANTINE_FILE)
+    args = parser.parse_args()
+
+    from quality_filter import MIN_QUALITY, resolve_vocabulary, score_texts
+
+    if not os.path.exists(args.manifest):
         print("❌ manifest.jsonl not found. Run extraction script first.")
         return
 
     # Read all lines first
-    with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+    with open(args.manifest, "r", encoding="utf-8") as f:
         lines = f.readlines()
 
     print(f"📦 Total resumes found: {len(lines)}")
 
+    # Quality gate on the raw text (before clean_text strips the symbols we score)
+    entries = [json.loads(line) for line in lines]
+    texts = [e.get("text", "") for e in entries]
+    vocab, vocab_source = resolve_vocabulary(texts, save=True)
+    print(f"📖 Quality vocabulary: {vocab_source}")
+    scores, features = score_texts(texts, vocab)
+
+    kept_lines = []
+    quarantined = 0
+    quarantined_labelable = 0   # would have survived the length check and been labeled
+
+    with open(args.quarantine, "w", encoding="utf-8") as fq:
+        for line, entry, score, feats in zip(lines, entries, scores, features):
+            if score >= MIN_QUALITY:
+                kept_lines.append(line)
+                continue
+
+            quarantined += 1
+            if len(clean_text(entry.get("text", ""))) >= MIN_TEXT_CHARS:
+                quarantined_labelable += 1
+            fq.write(json.dumps({
+                "filename": entry.get("filename", ""),
+                "role": entry.get("role", ""),
+                "quality_score": round(float(score), 4),
+                "features": feats,
+                "text": entry.get("text", "")
+            }, ensure_ascii=False) + "\n")
+
+    print(f"🧹 Quarantined {quarantined} low-quality documents (score < {MIN_QUALITY}) → {args.quarantine}")
+
     dataset = []
 
     # Worker count (leave 2 cores free)
@@ -79,7 +149,7 @@ def main():
     print(f"⚙️ Using {workers} parallel workers\n")
 
     with ProcessPoolExecutor(max_workers=workers) as executor:
-        futures = [executor.submit(process_manifest_line, line) for line in lines]
+        futures = [executor.submit(process_manifest_line, line) for line in kept_lines]
 
         for future in as_completed(futures):
             result = future.result()
@@ -87,14 +157,18 @@ def main():
                 dataset.append(result)
 
     # Write JSONL output
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+    with open(args.output, "w", encoding="utf-8") as f:
         for example in dataset:
             f.write(json.dumps(example) + "\n")
 
     print("\n✅ Training dataset created!")
-    print(f"📁 Saved: {OUTPUT_FILE}")
+    print(f"📁 Saved: {args.output}")
     print(f"📝 Total examples: {len(dataset)}")
 
+    seconds, source = label_seconds_per_resume()
+    print(f"⏱ Estimated labeling time saved: ~{quarantined_labelable * seconds / 60:.1f} min "
+          f"({quarantined_labelable} quarantined resumes that would be labeled × {seconds:.1f}s, {source})")
+
 
 if __name__ == "__main__":
     main()
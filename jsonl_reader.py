@@ -0,0 +1,330 @@
+import os
+import json
+import mmap
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+
+    def decode(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN / Infinity: written and accepted by stdlib json, rejected by orjson
+            return json.loads(data)
+
+except ImportError:  # stdlib fallback
+    def decode(data):
+        return json.loads(data)
+
+
+def encode_line(obj, ensure_ascii=False):
+    """Always stdlib json, so files match what the scripts wrote before (separators, escapes, NaN)."""
+    return (json.dumps(obj, ensure_ascii=ensure_ascii) + "\n").encode("utf-8")
+
+
+MIN_CHUNK_BYTES = 1 << 20        # don't split files into pieces smaller than 1 MiB
+CHUNKS_PER_WORKER = 4            # > 1 so uneven chunks still balance across workers
+
+REQUIRED_OUTPUT_KEYS = [
+    "grammar",
+    "skills",
+    "experience",
+    "projects",
+    "overall_summary"
+]
+
+NON_EMPTY_STRING = {"type": "string", "minLength": 1, "strip": True}
+
+# ---------------------------------------------------------
+# Dataset schemas (JSON-Schema subset)
+# ---------------------------------------------------------
+SCHEMAS = {
+    # training_data.jsonl / training_data_labeled.jsonl
+    "input": {
+        "type": "object",
+        "required": ["input"],
+        "properties": {"input": NON_EMPTY_STRING},
+    },
+    # training_data_normalized.jsonl
+    "input_output": {
+        "type": "object",
+        "required": ["input", "output"],
+        "properties": {
+            "input": NON_EMPTY_STRING,
+            "output": {"type": "object", "required": REQUIRED_OUTPUT_KEYS},
+        },
+    },
+    # training_data_chat*.jsonl / train / val / test splits
+    "chat": {
+        "type": "object",
+        "required": ["messages"],
+        "properties": {
+            "messages": {
+                "type": "array",
+                "minItems": 1,
+                "items": {
+                    "type": "object",
+                    "required": ["role", "content"],
+                    "properties": {
+                        "role": {"enum": ["system", "user", "assistant"]},
+                        "content": {"type": "string"},
+                    },
+                },
+            },
+        },
+    },
+}
+
+_TYPES = {
+    "object": (dict, "an object"),
+    "array": (list, "an array"),
+    "string": (str, "a string"),
+}
+
+
+# ---------------------------------------------------------
+# Schema compiler: schema dict → nested closures, built once per process
+# ---------------------------------------------------------
+def compile_schema(schema, path="record"):
+    """Return check(value) → None if valid, else an error message."""
+    checks = []
+
+    if "type" in schema:
+        py_type, type_name = _TYPES[schema["type"]]
+
+        def check_type(value):
+            if not isinstance(value, py_type):
+                return f"'{path}' must be {type_name}"
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+
+        def check_enum(value):
+            if value not in allowed:
+                return f"'{path}' must be one of {sorted(allowed)}"
+        checks.append(check_enum)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        strip = schema.get("strip", False)
+
+        def check_length(value):
+            if len(value.strip() if strip else value) < min_length:
+                return f"'{path}' must be a non-empty string"
+        checks.append(check_length)
+
+    if "required" in schema:
+        required = tuple(schema["required"])
+
+        def check_required(value):
+            missing = [k for k in required if k not in value]
+            if missing:
+                return f"Missing '{path}' keys: {missing}"
+        checks.append(check_required)
+
+    if "properties" in schema:
+        properties = [
+            (key, compile_schema(sub, key if path == "record" else f"{path}.{key}"))
+            for key, sub in schema["properties"].items()
+        ]
+
+        def check_properties(value):
+            for key, check in properties:
+                if key in value:
+                    error = check(value[key])
+                    if error:
+                        return error
+        checks.append(check_properties)
+
+    if "minItems" in schema:
+        min_items = schema["minItems"]
+
+        def check_min_items(value):
+            if len(value) < min_items:
+                return f"'{path}' must have at least {min_items} item(s)"
+        checks.append(check_min_items)
+
+    if "items" in schema:
+        check_item = compile_schema(schema["items"], f"{path}[]")
+
+        def check_items(value):
+            for item in value:
+                error = check_item(item)
+                if error:
+                    return error
+        checks.append(check_items)
+
+    checks = tuple(checks)
+
+    def check(value):
+        for c in checks:
+            error = c(value)
+            if error:
+                return error
+        return None
+
+    return check
+
+
+_compiled = {}
+
+
+def get_validator(schema_name):
+    if schema_name not in _compiled:
+        _compiled[schema_name] = compile_schema(SCHEMAS[schema_name])
+    return _compiled[schema_name]
+
+
+# ---------------------------------------------------------
+# Splitting: newline-aligned byte ranges
+# ---------------------------------------------------------
+def chunk_ranges(path, n_chunks):
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    n_chunks = max(1, min(n_chunks, size // MIN_CHUNK_BYTES))
+    step = size // n_chunks
+    ranges = []
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        for _ in range(n_chunks - 1):
+            nl = mm.find(b"\n", max(start, start + step - 1))
+            if nl == -1:
+                break
+            ranges.append((start, nl + 1))
+            start = nl + 1
+            if start >= size:
+                break
+        if start < size:
+            ranges.append((start, size))
+
+    return ranges
+
+
+# ---------------------------------------------------------
+# Worker: decode + validate (+ transform) one byte range
+# ---------------------------------------------------------
+def _process_range(path, start, end, schema_name, transform, out_path, keep_records, ensure_ascii):
+    validator = get_validator(schema_name) if schema_name else None
+    n_lines = 0
+    valid = 0
+    errors = []           # (line number within range, message)
+    records = [] if keep_records else None
+    out = open(out_path, "wb") if out_path else None
+
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos < end:
+                nl = mm.find(b"\n", pos, end)
+                if nl == -1:
+                    nl = end
+                line = mm[pos:nl]
+                pos = nl + 1
+                n_lines += 1
+
+                try:
+                    item = decode(line)
+                except Exception as e:
+                    errors.append((n_lines, f"Invalid JSON: {e}"))
+                    continue
+
+                if validator:
+                    error = validator(item)
+                    if error:
+                        errors.append((n_lines, error))
+                        continue
+
+                if transform:
+                    try:
+                        item = transform(item)
+                    except Exception as e:
+                        errors.append((n_lines, str(e)))
+                        continue
+
+                valid += 1
+                if out:
+                    out.write(encode_line(item, ensure_ascii))
+                if keep_records:
+                    records.append(item)
+    finally:
+        if out:
+            out.close()
+
+    return n_lines, valid, errors, records
+
+
+def default_workers():
+    return max(1, multiprocessing.cpu_count() - 2)
+
+
+def process_jsonl(path, schema=None, transform=None, output_path=None,
+                  keep_records=False, workers=None, ensure_ascii=False):
+    """Decode, validate and optionally transform a JSONL file across processes.
+
+    Records that fail decoding, validation or ``transform`` are reported in
+    ``errors`` as (line_number, message) and dropped. When ``output_path`` is
+    given, the surviving records are written there in input order, as
+    ``json.dumps(record, ensure_ascii=ensure_ascii)`` lines.
+    """
+    workers = workers or default_workers()
+    ranges = chunk_ranges(path, workers * CHUNKS_PER_WORKER)
+
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path))) if output_path else None
+    part_paths = [os.path.join(tmp_dir, f"part-{i:05d}.jsonl") if tmp_dir else None for i in range(len(ranges))]
+
+    try:
+        if len(ranges) <= 1 or workers == 1:
+            results = [
+                _process_range(path, s, e, schema, transform, p, keep_records, ensure_ascii)
+                for (s, e), p in zip(ranges, part_paths)
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_process_range, path, s, e, schema, transform, p, keep_records, ensure_ascii)
+                    for (s, e), p in zip(ranges, part_paths)
+                ]
+                results = [f.result() for f in futures]
+
+        if output_path:
+            with open(output_path, "wb") as fout:
+                for part in part_paths:
+                    with open(part, "rb") as fin:
+                        shutil.copyfileobj(fin, fout)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    total = 0
+    valid = 0
+    errors = []
+    records = [] if keep_records else None
+
+    for n_lines, n_valid, chunk_errors, chunk_records in results:
+        errors.extend((total + line, message) for line, message in chunk_errors)
+        total += n_lines
+        valid += n_valid
+        if keep_records:
+            records.extend(chunk_records)
+
+    return {
+        "total": total,
+        "valid": valid,
+        "invalid": total - valid,
+        "errors": errors,
+        "records": records,
+    }
+
+
+def read_jsonl(path, schema=None, workers=None):
+    """Return (records, errors) for a JSONL file small enough to hold in memory."""
+    report = process_jsonl(path, schema=schema, keep_records=True, workers=workers)
+    return report["records"], report["errors"]
@@ -1,4 +1,6 @@
-import json
+import argparse
+
+from jsonl_reader import process_jsonl
 
 INPUT_FILE = "training_data_labeled.jsonl"
 OUTPUT_FILE = "training_data_normalized.jsonl"
@@ -11,57 +13,57 @@ DEFAULT_OUTPUT = {
     "overall_summary": ""
 }
 
-fixed = 0
-skipped = 0
 
-with open(INPUT_FILE, "r", encoding="utf-8") as fin, \
-     open(OUTPUT_FILE, "w", encoding="utf-8") as fout:
+def normalize_item(item):
+    output = item.get("output", {})
 
-    for line in fin:
-        try:
-            item = json.loads(line)
+    normalized_output = {}
 
-            # Skip only if input is invalid
-            if "input" not in item or not isinstance(item["input"], str) or not item["input"].strip():
-                skipped += 1
-                continue
+    for key, default_value in DEFAULT_OUTPUT.items():
+        value = output.get(key, default_value)
 
-            output = item.get("output", {})
+        if value is None:
+            value = default_value
 
-            normalized_output = {}
+        # Skills must be list
+        if key == "skills" and not isinstance(value, list):
+            value = [value] if isinstance(value, str) else []
 
-            for key, default_value in DEFAULT_OUTPUT.items():
-                value = output.get(key, default_value)
+        # Force dict for experience & projects
+        if key in {"experience", "projects"} and not isinstance(value, dict):
+            value = {}
 
-                if value is None:
-                    value = default_value
+        # Force string fields
+        if key in {"grammar", "overall_summary"} and not isinstance(value, str):
+            value = ""
 
-                # Skills must be list
-                if key == "skills" and not isinstance(value, list):
-                    value = [value] if isinstance(value, str) else []
+        normalized_output[key] = value
 
-                # Force dict for experience & projects
-                if key in {"experience", "projects"} and not isinstance(value, dict):
-                    value = {}
+    return {
+        "input": item["input"],
+        "output": normalized_output
+    }
 
-                # Force string fields
-                if key in {"grammar", "overall_summary"} and not isinstance(value, str):
-                    value = ""
 
-                normalized_output[key] = value
+def main():
+    parser = argparse.ArgumentParser(description="Normalize labeled outputs.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
 
-            normalized_item = {
-                "input": item["input"],
-                "output": normalized_output
-            }
+    # Skip only if input is invalid ("input" schema) or output can't be normalized
+    report = process_jsonl(
+        args.input,
+        schema="input",
+        transform=normalize_item,
+        output_path=args.output
+    )
 
-            fout.write(json.dumps(normalized_item, ensure_ascii=False) + "\n")
-            fixed += 1
+    print("\n========== NORMALIZATION REPORT ==========")
+    print(f"Fixed & kept samples : {report['valid']}")
+    print(f"Skipped samples      : {report['invalid']}")
+    print("=========================================\n")
 
-        except Exception:
-            skipped += 1
 
-print("\n========== NORMALIZATION REPORT ==========")
-print(f"Fixed & kept samples : {fixed}")
-print(f"Skipped samples      : {skipped}")
-print("=========================================\n")
+if __name__ == "__main__":
+    main()
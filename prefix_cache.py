@@ -0,0 +1,286 @@
+import os
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+import re
+import copy
+import time
+import argparse
+from collections import OrderedDict
+
+import torch
+from transformers import DynamicCache
+
+from generate_training_data import PROMPT_VERSION, PROMPT_SUFFIX, build_prompt_prefix
+from convert_step3_to_chat import SYSTEM_PROMPT
+
+# ===============================
+# CONFIG
+# ===============================
+MAX_CACHE_MB = 2048          # budget for cached prefix KV states
+MIN_FREE_MB = 1024           # evict when free device / system memory drops below this
+
+BENCH_SAMPLES = 32
+CHECK_NEW_TOKENS = 64        # greedy tokens compared between cached and uncached runs
+
+
+# ---------------------------------------------------------
+# Prompt layout (matches tokenize() in train_lora_metal.py)
+# ---------------------------------------------------------
+def chat_prefix(role):
+    """Everything up to the resume body: system turn + fixed instruction text."""
+    return f"SYSTEM: {SYSTEM_PROMPT}\nUSER: {build_prompt_prefix(role)}"
+
+
+def chat_suffix(resume_text):
+    """Per-request part: resume body + closing instruction + assistant tag."""
+    return f"{resume_text}{PROMPT_SUFFIX}\nASSISTANT: "
+
+
+def split_user_prompt(user_content):
+    """Recover (role, resume_text) from a prompt built by build_training_pair."""
+    match = re.match(
+        r".*?for the role '(.*?)'\..*?RESUME:\n(.*)" + re.escape(PROMPT_SUFFIX) + r"$",
+        user_content,
+        re.DOTALL
+    )
+    if not match:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+# ---------------------------------------------------------
+# Memory helpers
+# ---------------------------------------------------------
+def kv_nbytes(cache):
+    if hasattr(cache, "layers"):
+        tensors = [t for layer in cache.layers for t in (layer.keys, layer.values) if t is not None]
+    else:
+        tensors = list(cache.key_cache) + list(cache.value_cache)
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def free_memory_bytes(device):
+    """Free memory on the device holding the KV tensors (None if unknown)."""
+    if device.type == "cuda":
+        return torch.cuda.mem_get_info(device)[0]
+    if device.type == "mps" and hasattr(torch.mps, "recommended_max_memory"):
+        return torch.mps.recommended_max_memory() - torch.mps.current_allocated_memory()
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        # POSIX without psutil (not available on macOS)
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+# ---------------------------------------------------------
+# Prefix KV cache
+# ---------------------------------------------------------
+class PrefixKVCache:
+    """LRU cache of prefill KV states keyed by (prompt version, role).
+
+    Entries are evicted oldest-first when the byte budget is exceeded or
+    when free memory drops below ``min_free_mb``.
+    """
+
+    def __init__(self, model, tokenizer, max_mb=MAX_CACHE_MB, min_free_mb=MIN_FREE_MB):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_bytes = max_mb * 1024 * 1024
+        self.min_free_bytes = min_free_mb * 1024 * 1024
+
+        self.entries = OrderedDict()   # key → (prefix_ids, DynamicCache, nbytes)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fallbacks = 0             # prompts whose tokenization did not start with the cached prefix
+        self.memory_unknown = False
+
+    def _low_memory(self):
+        free = free_memory_bytes(self.model.device)
+        if free is None:
+            if not self.memory_unknown:
+                print("⚠️ Free memory unknown on this device — evicting by byte budget only (pip install psutil)")
+                self.memory_unknown = True
+            return False
+        return free < self.min_free_bytes
+
+    def _evict_one(self):
+        _, (_, _, nbytes) = self.entries.popitem(last=False)
+        self.used_bytes -= nbytes
+        self.evictions += 1
+
+    def _make_room(self, nbytes):
+        while self.entries and (self.used_bytes + nbytes > self.max_bytes or self._low_memory()):
+            self._evict_one()
+
+    def clear(self):
+        self.entries.clear()
+        self.used_bytes = 0
+
+    def get(self, role):
+        """Return (prefix_ids, prefix_kv) for a role; prefill once on a miss."""
+        key = (PROMPT_VERSION, role)
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            prefix_ids, prefix_kv, _ = self.entries[key]
+            return prefix_ids, prefix_kv
+
+        self.misses += 1
+        prefix_ids = self.tokenizer(chat_prefix(role), return_tensors="pt").input_ids.to(self.model.device)
+
+        prefix_kv = DynamicCache()
+        with torch.no_grad():
+            self.model(input_ids=prefix_ids, past_key_values=prefix_kv, use_cache=True)
+
+        nbytes = kv_nbytes(prefix_kv)
+        self._make_room(nbytes)
+
+        if nbytes <= self.max_bytes:
+            self.entries[key] = (prefix_ids, prefix_kv, nbytes)
+            self.used_bytes += nbytes
+
+        return prefix_ids, prefix_kv
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "used_mb": self.used_bytes / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# ---------------------------------------------------------
+# Generation
+# ---------------------------------------------------------
+def generate_with_prefix(prefix_cache, role, prompt, max_new_tokens=512):
+    """Generate for one full prompt, prefilling only the tokens after the shared role prefix.
+
+    The prompt is tokenized as a whole (exactly like the uncached path); the
+    cached KV state is used only if its token ids are a prefix of those ids.
+    """
+    model = prefix_cache.model
+    tokenizer = prefix_cache.tokenizer
+
+    input_ids = tokenizer(prompt, return_tensors="pt").input_ids.to(model.device)
+
+    try:
+        prefix_ids, prefix_kv = prefix_cache.get(role)
+    except torch.OutOfMemoryError:
+        prefix_cache.clear()
+        prefix_ids, prefix_kv = prefix_cache.get(role)
+
+    n_prefix = prefix_ids.shape[1]
+    if input_ids.shape[1] <= n_prefix or not torch.equal(input_ids[:, :n_prefix], prefix_ids):
+        # Token boundary at the prefix/resume join differs → cached state does not apply
+        prefix_cache.fallbacks += 1
+        return generate_without_prefix(model, tokenizer, prompt, max_new_tokens)
+
+    with torch.no_grad():
+        output_ids = model.generate(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            past_key_values=copy.deepcopy(prefix_kv),   # generate() extends the cache in place
+            max_new_tokens=max_new_tokens,
+            do_sample=False,
+            pad_token_id=tokenizer.eos_token_id
+        )
+
+    return tokenizer.decode(output_ids[0, input_ids.shape[1]:], skip_special_tokens=True)
+
+
+def generate_without_prefix(model, tokenizer, prompt, max_new_tokens=512):
+    encoded = tokenizer(prompt, return_tensors="pt").to(model.device)
+
+    with torch.no_grad():
+        output_ids = model.generate(
+            **encoded,
+            max_new_tokens=max_new_tokens,
+            do_sample=False,
+            pad_token_id=tokenizer.eos_token_id
+        )
+
+    return tokenizer.decode(output_ids[0, encoded["input_ids"].shape[1]:], skip_special_tokens=True)
+
+
+# ---------------------------------------------------------
+# MAIN (TTFT benchmark on the test split)
+# ---------------------------------------------------------
+def main():
+    from evaluate_lora import BASE_MODEL, ADAPTER_DIR, TEST_FILE, load_model, pick_device
+    import json
+
+    parser = argparse.ArgumentParser(description="Measure TTFT with and without prefix KV reuse.")
+    parser.add_argument("--base-model", default=BASE_MODEL)
+    parser.add_argument("--adapter", default=ADAPTER_DIR)
+    parser.add_argument("--samples", type=int, default=BENCH_SAMPLES)
+    args = parser.parse_args()
+
+    requests = []
+    with open(TEST_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            user = next(m["content"] for m in json.loads(line)["messages"] if m["role"] == "user")
+            role, resume_text = split_user_prompt(user)
+            if role is not None:
+                requests.append((role, resume_text))
+            if len(requests) >= args.samples:
+                break
+
+    device = pick_device()
+    tokenizer, model = load_model(args.base_model, args.adapter, device)
+    prefix_cache = PrefixKVCache(model, tokenizer)
+
+    # max_new_tokens=1 → wall time is the time to first token
+    timings = {"uncached": [], "cached": []}
+    for role, resume_text in requests:
+        prompt = chat_prefix(role) + chat_suffix(resume_text)
+
+        start = time.perf_counter()
+        generate_without_prefix(model, tokenizer, prompt, max_new_tokens=1)
+        timings["uncached"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        generate_with_prefix(prefix_cache, role, prompt, max_new_tokens=1)
+        timings["cached"].append(time.perf_counter() - start)
+
+    # Correctness: greedy continuations must not depend on the cache
+    mismatches = []
+    for role, resume_text in requests:
+        prompt = chat_prefix(role) + chat_suffix(resume_text)
+        uncached_text = generate_without_prefix(model, tokenizer, prompt, max_new_tokens=CHECK_NEW_TOKENS)
+        cached_text = generate_with_prefix(prefix_cache, role, prompt, max_new_tokens=CHECK_NEW_TOKENS)
+        if cached_text != uncached_text:
+            mismatches.append(role)
+
+    prefix_tokens = [len(tokenizer(chat_prefix(r)).input_ids) for r, _ in requests]
+    total_tokens = [len(tokenizer(chat_prefix(r) + chat_suffix(t)).input_ids) for r, t in requests]
+
+    uncached = sum(timings["uncached"]) / len(requests)
+    cached = sum(timings["cached"]) / len(requests)
+    stats = prefix_cache.stats()
+
+    print("\n========== PREFIX CACHE REPORT ==========")
+    print(f"Requests             : {len(requests)}")
+    print(f"Avg prompt tokens    : {sum(total_tokens) / len(requests):.0f}")
+    print(f"Avg prefix tokens    : {sum(prefix_tokens) / len(requests):.0f}")
+    print(f"TTFT uncached (avg)  : {uncached * 1000:.1f} ms")
+    print(f"TTFT cached (avg)    : {cached * 1000:.1f} ms  (includes {stats['misses']} prefill misses)")
+    print(f"Greedy outputs match : {len(requests) - len(mismatches)}/{len(requests)} ({CHECK_NEW_TOKENS} tokens)")
+    print(f"Cache                : {stats}")
+    if mismatches:
+        print(f"⚠️ Cached output differs for roles: {sorted(set(mismatches))}")
+    print("=========================================\n")
+
+
+if __name__ == "__main__":
+    main()
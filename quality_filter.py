@@ -0,0 +1,283 @@
+import os
+import re
+import json
+import argparse
+import math
+import numpy as np
+
+from settings import SETTINGS
+
+MANIFEST_FILE = os.path.join(SETTINGS["extract_dir"], "manifest.jsonl")
+
+BATCH_SIZE = 1024
+
+# Calibrated on the 8,900-resume corpus with the corpus-only vocabulary below:
+# ~2% of documents fall under it, nearly all unreadable OCR or lorem-ipsum templates
+MIN_QUALITY = 0.6
+
+# Corpus-derived dictionary: a token is a "word" if it appears in at least
+# MIN_DOC_SHARE of all documents (and never fewer than MIN_DOC_FREQ).
+# Consistent OCR misreads ("devetoper") recur in a handful of files, so a
+# small absolute count lets them in.
+MIN_DOC_SHARE = 0.001
+MIN_DOC_FREQ = 3
+
+# Optional extra vocabulary (one word per line), e.g. /usr/share/dict/words.
+# Not used unless set, so scores are the same on every OS.
+WORD_LIST = SETTINGS["word_list"]
+
+# Reference vocabulary, built once from a corpus-sized manifest and reused by
+# later (possibly small, incremental) runs. Below MIN_VOCAB_DOCS documents a
+# corpus vocabulary is unreliable: on 20 clean resumes most words occur in
+# < 3 documents and ~90% would be quarantined.
+VOCAB_FILE = SETTINGS["quality_vocab_file"]
+MIN_VOCAB_DOCS = 500
+
+WORD_RE = re.compile(r"[A-Za-z]{2,}")
+
+# Character classes (ASCII lookup table; everything >= 128 is NON_ASCII)
+ALPHA, DIGIT, SPACE, PUNCT, SYMBOL, NON_ASCII = range(6)
+N_CLASSES = 6
+
+_CHAR_CLASS = np.full(128, SYMBOL, dtype=np.int64)
+for _c in range(128):
+    _ch = chr(_c)
+    if _ch.isalpha():
+        _CHAR_CLASS[_c] = ALPHA
+    elif _ch.isdigit():
+        _CHAR_CLASS[_c] = DIGIT
+    elif _ch.isspace():
+        _CHAR_CLASS[_c] = SPACE
+    elif _ch in ".,;:!?'\"()-/&%+@":
+        _CHAR_CLASS[_c] = PUNCT
+
+
+# ---------------------------------------------------------
+# Dictionary
+# ---------------------------------------------------------
+def min_doc_freq_for(n_docs):
+    return max(MIN_DOC_FREQ, math.ceil(MIN_DOC_SHARE * n_docs))
+
+
+def build_vocabulary(texts, min_doc_freq=None):
+    """Words seen in enough documents to not be OCR noise."""
+    if min_doc_freq is None:
+        min_doc_freq = min_doc_freq_for(len(texts))
+
+    doc_freq = {}
+    for text in texts:
+        for word in set(WORD_RE.findall(text.lower())):
+            doc_freq[word] = doc_freq.get(word, 0) + 1
+
+    return {w for w, n in doc_freq.items() if n >= min_doc_freq}
+
+
+def load_word_list(path):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Word list not found: {path}")
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return {line.strip().lower() for line in f if line.strip()}
+
+
+def save_vocabulary(vocab, path=VOCAB_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(sorted(vocab)) + "\n")
+
+
+def resolve_vocabulary(texts, save=False, rebuild=False):
+    """Return (vocab, source) used to score `texts`; vocab is None if none is reliable.
+
+    Order: saved reference vocabulary → built from `texts` if there are at
+    least MIN_VOCAB_DOCS of them (saved when `save`) → word_list alone → None.
+    """
+    if os.path.exists(VOCAB_FILE) and not rebuild:
+        vocab, source = load_word_list(VOCAB_FILE), VOCAB_FILE
+    elif len(texts) >= MIN_VOCAB_DOCS:
+        vocab = build_vocabulary(texts)
+        source = f"built from {len(texts)} documents (doc freq >= {min_doc_freq_for(len(texts))})"
+        if save:
+            save_vocabulary(vocab)
+            source += f" → saved to {VOCAB_FILE}"
+    elif WORD_LIST:
+        vocab, source = set(), "word_list only"
+    else:
+        return None, f"none (< {MIN_VOCAB_DOCS} documents and no {VOCAB_FILE}) — dictionary check skipped"
+
+    if WORD_LIST:
+        vocab |= load_word_list(WORD_LIST)
+        source += f" + {WORD_LIST}"
+    return vocab, source
+
+
+# ---------------------------------------------------------
+# Vectorized features (one batch of documents)
+# ---------------------------------------------------------
+def _group_ids(items_per_doc):
+    """Flatten per-doc lists → (count per doc, doc index per item, unique-id per item, uniques, #unique)."""
+    counts = np.array([len(items) for items in items_per_doc], dtype=np.int64)
+    doc_ids = np.repeat(np.arange(len(items_per_doc)), counts)
+
+    # Hash-based interning (np.unique on object arrays falls back to slow Python sorting)
+    ids = {}
+    inverse = np.fromiter(
+        (ids.setdefault(x, len(ids)) for items in items_per_doc for x in items),
+        dtype=np.int64,
+        count=int(counts.sum())
+    )
+    return counts, doc_ids, inverse, list(ids), len(ids)
+
+
+def char_class_histogram(texts):
+    """(n_docs, N_CLASSES) share of characters in each class."""
+    n = len(texts)
+    # surrogatepass: lone surrogates (broken PDF text) stay one code unit each → NON_ASCII
+    codes = np.frombuffer("".join(texts).encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32)
+    lengths = np.array([len(t) for t in texts], dtype=np.int64)
+    doc_ids = np.repeat(np.arange(n), lengths)
+
+    classes = np.full(codes.shape, NON_ASCII, dtype=np.int64)
+    ascii_mask = codes < 128
+    classes[ascii_mask] = _CHAR_CLASS[codes[ascii_mask]]
+
+    hist = np.bincount(doc_ids * N_CLASSES + classes, minlength=n * N_CLASSES)
+    hist = hist.reshape(n, N_CLASSES).astype(np.float64)
+    return hist / np.maximum(lengths, 1)[:, None]
+
+
+def word_features(texts, vocab):
+    """Dictionary-word ratio (0 if vocab is None) and normalized token entropy per document."""
+    n = len(texts)
+    counts, doc_ids, inverse, uniques, n_unique = _group_ids(
+        [WORD_RE.findall(t.lower()) for t in texts]
+    )
+
+    if n_unique == 0:
+        return np.zeros(n), np.zeros(n), counts
+
+    in_vocab = np.fromiter((vocab is not None and u in vocab for u in uniques), dtype=bool, count=n_unique)
+    dict_hits = np.bincount(doc_ids, weights=in_vocab[inverse], minlength=n)
+    dict_ratio = dict_hits / np.maximum(counts, 1)
+
+    # Entropy of each document's token distribution
+    pair_keys, pair_counts = np.unique(doc_ids * n_unique + inverse, return_counts=True)
+    pair_docs = pair_keys // n_unique
+    p = pair_counts / counts[pair_docs]
+    entropy = np.bincount(pair_docs, weights=-p * np.log2(p), minlength=n)
+
+    # Normalize by the maximum possible entropy so short and long resumes compare
+    max_entropy = np.log2(np.maximum(counts, 2))
+    return dict_ratio, entropy / max_entropy, counts
+
+
+def repeated_line_share(texts):
+    """Share of non-empty lines that duplicate an earlier line in the same document."""
+    n = len(texts)
+    counts, doc_ids, inverse, _, n_unique = _group_ids(
+        [[line.strip() for line in t.splitlines() if line.strip()] for t in texts]
+    )
+
+    if n_unique == 0:
+        return np.zeros(n)
+
+    distinct = np.bincount(np.unique(doc_ids * n_unique + inverse) // n_unique, minlength=n)
+    return (counts - distinct) / np.maximum(counts, 1)
+
+
+def score_batch(texts, vocab):
+    """Return (scores, features) for a batch of raw resume texts.
+
+    With vocab=None the dictionary-word sub-score is left out.
+    """
+    hist = char_class_histogram(texts)
+    dict_ratio, entropy, n_words = word_features(texts, vocab)
+    repeats = repeated_line_share(texts)
+
+    alpha = hist[:, ALPHA]
+    noise = hist[:, SYMBOL] + hist[:, NON_ASCII]
+
+    sub_scores = [
+        np.clip((alpha - 0.45) / 0.25, 0, 1),         # mostly letters
+        np.clip(1 - (noise - 0.05) / 0.15, 0, 1),      # few stray symbols
+        np.clip((entropy - 0.6) / 0.2, 0, 1),          # not the same few tokens
+        np.clip(1 - (repeats - 0.3) / 0.4, 0, 1),      # not repeated header/footer junk
+    ]
+    if vocab is not None:
+        sub_scores.append(np.clip((dict_ratio - 0.6) / 0.3, 0, 1))   # real words (clean resumes: median ~0.97)
+    sub_scores = np.stack(sub_scores)
+    # Half average, half worst feature: one clearly broken signal is enough to drop a document
+    scores = 0.5 * sub_scores.mean(axis=0) + 0.5 * sub_scores.min(axis=0)
+    scores[n_words == 0] = 0.0
+
+    features = {
+        "alpha_ratio": alpha,
+        "digit_ratio": hist[:, DIGIT],
+        "space_ratio": hist[:, SPACE],
+        "punct_ratio": hist[:, PUNCT],
+        "noise_ratio": noise,
+        "dict_word_ratio": dict_ratio,
+        "token_entropy": entropy,
+        "repeated_line_share": repeats,
+    }
+    return scores, features
+
+
+def score_texts(texts, vocab=None, batch_size=BATCH_SIZE):
+    """Score the whole corpus in batches; returns (scores, list of feature dicts).
+
+    Without an explicit vocab, resolve_vocabulary() picks one (or none).
+    """
+    if vocab is None:
+        vocab, _ = resolve_vocabulary(texts)
+
+    scores = np.zeros(len(texts))
+    feature_rows = []
+
+    for start in range(0, len(texts), batch_size):
+        batch_scores, features = score_batch(texts[start:start + batch_size], vocab)
+        scores[start:start + len(batch_scores)] = batch_scores
+        for i in range(len(batch_scores)):
+            feature_rows.append({k: round(float(v[i]), 4) for k, v in features.items()})
+
+    return scores, feature_rows
+
+
+# ---------------------------------------------------------
+# MAIN (score distribution for threshold tuning)
+# ---------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Report OCR-noise quality scores for the manifest.")
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    parser.add_argument(
+        "--rebuild-vocab",
+        action="store_true",
+        help=f"rebuild {VOCAB_FILE} from this manifest (use the full reference corpus)"
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.manifest):
+        print("❌ manifest.jsonl not found. Run extraction script first.")
+        return
+
+    with open(args.manifest, "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+
+    texts = [e.get("text", "") for e in entries]
+    vocab, vocab_source = resolve_vocabulary(texts, save=True, rebuild=args.rebuild_vocab)
+    scores, _ = score_texts(texts, vocab)
+
+    print("\n========== QUALITY SCORE REPORT ==========")
+    print(f"Documents        : {len(texts)}")
+    print(f"Vocabulary       : {len(vocab) if vocab is not None else 0} words, {vocab_source}")
+    for q in (1, 5, 10, 25, 50):
+        print(f"p{q:<2} score        : {np.percentile(scores, q):.3f}")
+    print(f"Below {MIN_QUALITY:<4}       : {(scores < MIN_QUALITY).sum()}")
+
+    print("\nLowest scoring:")
+    for i in np.argsort(scores)[:10]:
+        print(f"  {scores[i]:.3f}  {entries[i].get('filename', '')}")
+    print("==========================================\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,20 @@
 import os
 import json
-import pdfplumber
-import pytesseract
-from pdf2image import convert_from_path
-from docx import Document
-from PIL import Image
+import argparse
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 
-# ----- CHANGE THESE -----
-DATA_DIR = "data"
-OUTPUT_DIR = "extracted_texts"
-POPPLER_PATH = r"C:\Users\GJ\Desktop\prajwal\fine tuning LLM\poppler-25.12.0\Library\bin"
-# ------------------------
+from docx_stream import extract_docx_text
+from settings import SETTINGS
 
-# Add Poppler to PATH
-os.environ["PATH"] += os.pathsep + POPPLER_PATH
+# OCR / PDF libraries are imported inside the extractors that need them,
+# so a DOCX-only run never loads pdfplumber, pytesseract, pdf2image or PIL.
 
-# Create output folder
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# ----- Set in resume_llm.json (see settings.py) -----
+DATA_DIR = SETTINGS["data_dir"]
+OUTPUT_DIR = SETTINGS["extract_dir"]
+POPPLER_PATH = SETTINGS["poppler_path"]
+# ----------------------------------------------------
 
 MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.jsonl")
 
@@ -28,6 +24,8 @@ MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.jsonl")
 # ---------------------------------------------------------
 def extract_from_pdf(pdf_path):
     """Extract text from normal PDFs + scanned image PDFs using OCR."""
+    import pdfplumber
+
     text = ""
 
     # Step 1: Try to extract text using pdfplumber
@@ -48,7 +46,10 @@ def extract_from_pdf(pdf_path):
     print(f"🔍 OCR fallback for scanned PDF: {pdf_path}")
 
     try:
-        images = convert_from_path(pdf_path, dpi=300)
+        import pytesseract
+        from pdf2image import convert_from_path
+
+        images = convert_from_path(pdf_path, dpi=300, poppler_path=POPPLER_PATH or None)
         ocr_text = ""
 
         for img in images:
@@ -66,9 +67,9 @@ def extract_from_pdf(pdf_path):
 # Word (.docx) Extraction
 # ---------------------------------------------------------
 def extract_from_word(path):
+    """Stream word/document.xml + headers/footers (keeps tables and text boxes)."""
     try:
-        doc = Document(path)
-        return "\n".join(p.text for p in doc.paragraphs).strip()
+        return extract_docx_text(path)
     except Exception:
         return ""
 
@@ -78,6 +79,9 @@ def extract_from_word(path):
 # ---------------------------------------------------------
 def extract_from_image(image_path):
     try:
+        import pytesseract
+        from PIL import Image
+
         img = Image.open(image_path).convert("RGB")
         return pytesseract.image_to_string(img).strip()
     except Exception:
@@ -115,6 +119,12 @@ def process_one_file(args):
 # Main (MULTIPROCESSING VERSION – FAST)
 # ---------------------------------------------------------
 def main():
+    # Paths come from settings (data_dir / extract_dir / poppler_path)
+    argparse.ArgumentParser(description="Extract text from PDF / image / DOCX resumes.").parse_args()
+
+    # Create output folder
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
     manifest_entries = []
     tasks = []
 
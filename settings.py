@@ -0,0 +1,55 @@
+import os
+import json
+
+# ===============================
+# Defaults (override in resume_llm.json or with RESUME_LLM_<KEY> env vars)
+# ===============================
+DEFAULTS = {
+    # Extraction
+    "data_dir": "data",
+    "extract_dir": "extracted_texts",
+    "poppler_path": "",                  # folder with pdftoppm (Windows: poppler-25.12.0/Library/bin); empty → PATH
+
+    # Token filter
+    "tokenizer_model": "mistralai/Mistral-7B-v0.1",
+    "tokenizer_file": "tokenizers/mistral-7b-v0.1.json",
+    "max_tokens": 4096,
+
+    # Quality filter
+    "word_list": "",                     # optional extra vocabulary file (e.g. /usr/share/dict/words)
+    "quality_vocab_file": "tokenizers/quality_vocab.txt",   # reference vocabulary (built on the first full run)
+
+    # Labeling
+    "ollama_model": "phi3:instruct",
+    "ollama_url": "http://localhost:11434/api/generate",
+    "label_seconds_per_resume": 20.0,    # fallback cost estimate until auto_label_ollama.py has run
+
+    # Training / inference
+    "base_model": "microsoft/Phi-3-mini-4k-instruct",
+    "adapter_dir": "./resume-lora",
+}
+
+CONFIG_FILE = os.environ.get("RESUME_LLM_CONFIG", "resume_llm.json")
+
+
+def load_settings(path=CONFIG_FILE):
+    settings = dict(DEFAULTS)
+
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+
+        unknown = set(overrides) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown keys in {path}: {sorted(unknown)}")
+        settings.update(overrides)
+
+    for key, default in DEFAULTS.items():
+        env_value = os.environ.get(f"RESUME_LLM_{key.upper()}")
+        if env_value is not None:
+            settings[key] = type(default)(env_value)
+
+    return settings
+
+
+SETTINGS = load_settings()
@@ -1,5 +1,5 @@
-import json
 import random
+import argparse
 
 INPUT_FILE = "training_data_chat_filtered.jsonl"
 
@@ -13,34 +13,47 @@ TEST_RATIO = 0.1
 
 assert TRAIN_RATIO + VAL_RATIO + TEST_RATIO == 1.0
 
-# For reproducibility
-random.seed(42)
 
-with open(INPUT_FILE, "r", encoding="utf-8") as f:
-    lines = f.readlines()
+def main():
+    parser = argparse.ArgumentParser(description="Split the filtered chat dataset into train / val / test.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--train", default=TRAIN_FILE)
+    parser.add_argument("--val", default=VAL_FILE)
+    parser.add_argument("--test", default=TEST_FILE)
+    args = parser.parse_args()
 
-random.shuffle(lines)
+    # For reproducibility
+    random.seed(42)
 
-total = len(lines)
-train_end = int(total * TRAIN_RATIO)
-val_end = train_end + int(total * VAL_RATIO)
+    with open(args.input, "r", encoding="utf-8") as f:
+        lines = f.readlines()
 
-train_data = lines[:train_end]
-val_data = lines[train_end:val_end]
-test_data = lines[val_end:]
+    random.shuffle(lines)
 
-with open(TRAIN_FILE, "w", encoding="utf-8") as f:
-    f.writelines(train_data)
+    total = len(lines)
+    train_end = int(total * TRAIN_RATIO)
+    val_end = train_end + int(total * VAL_RATIO)
 
-with open(VAL_FILE, "w", encoding="utf-8") as f:
-    f.writelines(val_data)
+    train_data = lines[:train_end]
+    val_data = lines[train_end:val_end]
+    test_data = lines[val_end:]
 
-with open(TEST_FILE, "w", encoding="utf-8") as f:
-    f.writelines(test_data)
+    with open(args.train, "w", encoding="utf-8") as f:
+        f.writelines(train_data)
 
-print("\n========== DATASET SPLIT REPORT ==========")
-print(f"Total samples : {total}")
-print(f"Train samples : {len(train_data)}")
-print(f"Val samples   : {len(val_data)}")
-print(f"Test samples  : {len(test_data)}")
-print("=========================================\n")
+    with open(args.val, "w", encoding="utf-8") as f:
+        f.writelines(val_data)
+
+    with open(args.test, "w", encoding="utf-8") as f:
+        f.writelines(test_data)
+
+    print("\n========== DATASET SPLIT REPORT ==========")
+    print(f"Total samples : {total}")
+    print(f"Train samples : {len(train_data)}")
+    print(f"Val samples   : {len(val_data)}")
+    print(f"Test samples  : {len(test_data)}")
+    print("=========================================\n")
+
+
+if __name__ == "__main__":
+    main()
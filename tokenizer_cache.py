@@ -0,0 +1,46 @@
+import os
+import argparse
+
+from settings import SETTINGS
+
+
+def cache_tokenizer(model_name=None, path=None):
+    """Serialize the fast tokenizer of `model_name` to a single tokenizer.json file."""
+    from transformers import AutoTokenizer
+
+    model_name = model_name or SETTINGS["tokenizer_model"]
+    path = path or SETTINGS["tokenizer_file"]
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tokenizer.backend_tokenizer.save(path)
+    return path
+
+
+def load_tokenizer(path=None):
+    """Load the cached tokenizer with `tokenizers` only (no transformers import).
+
+    Creates the cache on first use.
+    """
+    from tokenizers import Tokenizer
+
+    path = path or SETTINGS["tokenizer_file"]
+    if not os.path.exists(path):
+        print(f"⚙️ Caching tokenizer {SETTINGS['tokenizer_model']} → {path}")
+        cache_tokenizer(path=path)
+
+    return Tokenizer.from_file(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save the filter tokenizer to a local tokenizer.json.")
+    parser.add_argument("--model", default=SETTINGS["tokenizer_model"])
+    parser.add_argument("--output", default=SETTINGS["tokenizer_file"])
+    args = parser.parse_args()
+
+    path = cache_tokenizer(args.model, args.output)
+    print(f"✅ Tokenizer saved: {path}")
+
+
+if __name__ == "__main__":
+    main()